@@ -1,26 +1,52 @@
 from __future__ import annotations
 
-import argparse
-import io
+import concurrent.futures
+import functools
 import itertools
+import os
 import pathlib
 import re
 import shlex
 import subprocess
 import sys
-import textwrap
-import tokenize
+import tempfile
 import warnings
+from collections import defaultdict
 from typing import TYPE_CHECKING, TypeVar
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    import argparse
+    from collections.abc import Callable, Iterable, Sequence
 
 
 T = TypeVar("T")
 # contains (file_path, line_number, error_code); file to update, line within that file to
 # append `type: ignore[<error-code>]`
 FileUpdate = tuple[str, int, str]
+# contains (file_path, line_number, error_codes); all error codes which need ignoring on a line,
+# sorted and unique.
+LineUpdate = tuple[str, int, list[str]]
+UpdateT = TypeVar("UpdateT", FileUpdate, LineUpdate)
+# file_path mapped to the lines of that file, lets several passes update a file before it's
+# written out.
+FileCache = dict[str, list[str]]
+
+# Patterns used when parsing mypy reports and updating files, compiled once rather than per line.
+_SUMMARY_RE = re.compile(r"^Found [0-9]+ errors? in [0-9]+")
+_TYPE_IGNORE_RE = re.compile(r"#\s*type:\s*ignore(?:\[[^\]]*\])?")
+# Used to find where a trailing comment starts: string literals are matched (and skipped over)
+# so that a '#' within them isn't taken as the start of a comment. Triple quoted strings need to
+# come before single quoted ones, otherwise '""' would match as an empty string. f-string prefixes
+# are captured as replacement fields can contain other strings (reusing the same quote from 3.12).
+_COMMENT_SCANNER_RE = re.compile(
+    r"(?P<fstring>\b(?:[fF][rR]?|[rR][fF]))?"
+    r"(?:'''(?:\\.|[^\\])*?'''"
+    r'|"""(?:\\.|[^\\])*?"""'
+    r"|'(?:\\.|[^'\\])*'"
+    r'|"(?:\\.|[^"\\])*")'
+    r"|(?P<comment>#)"
+    r"""|(?P<unterminated>['"])"""
+)
 
 
 def raise_if_none(*, value: T | None) -> T:
@@ -34,15 +60,23 @@ def generate_mypy_error_report(
     *,
     path_to_code: pathlib.Path,
     mypy_flags: list[str],
-) -> str:
-    """Run mypy and generate report with errors."""
+    report_output: pathlib.Path,
+    mypy_executable: Sequence[str] = ("mypy",),
+) -> None:
+    """
+    Run mypy and generate report with errors.
+
+    mypy's output is written directly to report_output rather than being held in memory, as it
+    can be large for big projects. mypy_executable is the command used to run mypy, which takes
+    the path and flags as arguments - eg: `dmypy run --` to use a running mypy daemon.
+    """
     no_arguments_passed = (len(mypy_flags) == 0) or ((len(mypy_flags) == 1) and mypy_flags[0] == "")
 
     if no_arguments_passed:
         # If no flags are passed we just assume we want to get things ready to
         # use with --strict going forwards.
         mypy_command = [
-            "mypy",
+            *mypy_executable,
             f"{str(path_to_code)}",
             # Want error codes output from mypy to re-add in ignores.
             "--show-error-codes",
@@ -52,7 +86,7 @@ def generate_mypy_error_report(
         ]
     else:
         mypy_command = [
-            "mypy",
+            *mypy_executable,
             f"{str(path_to_code)}",
             # Leaving --show-error-codes and --no-pretty as the error codes are
             # necessary to enable parsing the report output and writing back to
@@ -67,12 +101,13 @@ def generate_mypy_error_report(
     print(f"Generating mypy report using: {' '.join(mypy_command)}")
 
     # Mypy is likely to return '1' here (otherwise pointless using this script)
-    mypy_process = subprocess.run(  # pylint: disable=subprocess-run-check
-        mypy_command,
-        capture_output=True,
-    )
-    # don't think there's any need to check stderr
-    return mypy_process.stdout.decode()
+    with report_output.open("wb") as report:
+        subprocess.run(  # pylint: disable=subprocess-run-check
+            mypy_command,
+            stdout=report,
+            # don't think there's any need to check stderr
+            stderr=subprocess.DEVNULL,
+        )
 
 
 def exit_if_no_errors(
@@ -95,6 +130,27 @@ def exit_if_no_errors(
 # --- Add ` # type: ignore[<error-code>]` to lines which throw errors.
 
 
+@functools.lru_cache(maxsize=4096)
+def _find_comment_start(line: str) -> int | None:
+    """
+    Return the index of the first `#` in line which isn't within a string literal, -1 if none.
+
+    This is a much cheaper alternative to running the tokenizer over the line. None is returned
+    when the line can't be handled with certainty (unterminated strings, f-strings with replacement
+    fields) in which case the caller should fall back to using tokenize.
+
+    Results are cached as the same lines (eg: with the same trailing comment) often recur.
+    """
+    for match in _COMMENT_SCANNER_RE.finditer(line):
+        if match.lastgroup == "comment":
+            return match.start()
+        if match.lastgroup == "unterminated":
+            return None
+        if match.group("fstring") is not None and "{" in match.group():
+            return None
+    return -1
+
+
 def extract_code_comment(*, line: str) -> tuple[str, str]:
     """
     Break line into code,comment if necessary.
@@ -106,6 +162,17 @@ def extract_code_comment(*, line: str) -> tuple[str, str]:
     if "#" not in line:
         return line, ""
 
+    comment_start = _find_comment_start(line)
+    if comment_start == -1:
+        # Any '#' in the line is within a string literal.
+        return line, ""
+    if comment_start is not None:
+        return line[:comment_start], line[comment_start:]
+
+    # Only needed for lines the scanner can't handle, so not imported unless they come up.
+    import io  # noqa: PLC0415
+    import tokenize  # noqa: PLC0415
+
     # generate_tokens wants a "callable returning a single line of input"
     reader = io.StringIO(line).readline
 
@@ -114,50 +181,167 @@ def extract_code_comment(*, line: str) -> tuple[str, str]:
     try:
         comment_tokens = [t for t in tokenize.generate_tokens(reader) if t.type == tokenize.COMMENT]
     except tokenize.TokenError as er:
-        warnings.warn(f"TokenError encountered: {er} for line {line}.", UserWarning, stacklevel=2)
+        warnings.warn(
+            f"Unterminated string literal for line {line}: {er}.", UserWarning, stacklevel=2
+        )
         return line, ""
 
-    # If there's an inline comment then only expect a single one.
-    if len(comment_tokens) != 1:
-        msg = f"Expected there to be a single comment token, have {len(comment_tokens)}"
-        raise ValueError(
-            msg,
-        )
+    if not comment_tokens:
+        return line, ""
 
     comment_token = comment_tokens[0]
-    python_code = line[0 : comment_token.start[1]]
-    python_comment = line[comment_token.start[1] :]
-    return python_code, python_comment
+    return line[: comment_token.start[1]], line[comment_token.start[1] :]
+
+
+def _filter_report_lines(lines: Iterable[str]) -> list[str]:
+    # Filter while reading rather than building intermediate lists:
+    # - eg: "Found 1 error in 1 file (checked 5 source files)", have no use for this.
+    # - typically a '' at the end of the report - any lines which are just '' (or ' ') are
+    #   of no use though.
+    error_report_lines = [
+        line.rstrip("\n") for line in lines if line.strip() and not _SUMMARY_RE.match(line)
+    ]
+    # return list sorted by file path (file path is at the start of all lines in error report).
+    error_report_lines.sort()
+    return error_report_lines
 
 
 def read_mypy_error_report(
     *,
     path_to_error_report: pathlib.Path,
 ) -> list[str]:
-    error_report_lines = path_to_error_report.read_text().split("\n")
-    # eg: "Found 1 error in 1 file (checked 5 source files)", have no use for this.
-    summary_regex = re.compile(r"^Found [0-9]+ errors? in [0-9]+")
-    error_report_lines_no_summary = [
-        line for line in error_report_lines if summary_regex.match(line) is None
-    ]
-    # typically a '' at the end of the report - any lines which are just '' (or ' ') are
-    # of no use though.
-    error_report_lines_filtered = [line for line in error_report_lines_no_summary if line.strip()]
-    # return list sorted by file path (file path is at the start of all lines in error report).
-    return sorted(error_report_lines_filtered)
+    with path_to_error_report.open(encoding="utf8") as report:
+        return _filter_report_lines(report)
+
+
+def parse_mypy_error_report(
+    *,
+    report_text: str,
+) -> list[str]:
+    """Get error report lines from mypy output which is already in memory."""
+    return _filter_report_lines(report_text.splitlines())
+
+
+def _get_error_report_lines(
+    *,
+    report_output: pathlib.Path | None,
+    report_text: str | None,
+) -> list[str]:
+    if report_text is not None:
+        return parse_mypy_error_report(report_text=report_text)
+    if report_output is None:
+        msg = "One of report_output or report_text is required"
+        raise RuntimeError(msg)
+    return read_mypy_error_report(path_to_error_report=report_output)
+
+
+def _read_file_lines(*, file_path: str, file_cache: FileCache | None) -> list[str]:
+    """Get lines of file_path, from file_cache if it's already been read."""
+    if file_cache is not None and file_path in file_cache:
+        return file_cache[file_path]
+    # Lines keep their endings (newline="" means they're not translated either) so the file can be
+    # written back out exactly as it was, apart from any updated lines.
+    with open(file_path, encoding="utf8", newline="") as file:
+        file_lines = file.readlines()
+    if file_cache is not None:
+        file_cache[file_path] = file_lines
+    return file_lines
+
+
+def _write_file_lines(file_path: str, file_lines: list[str]) -> None:
+    """
+    Write file_lines out to file_path.
+
+    The content is encoded once and written directly to a file descriptor, avoiding the overhead
+    of a text wrapper per file. It's written to a temporary file which then replaces the original
+    so that files are never left partially written.
+    """
+    data = memoryview("".join(file_lines).encode("utf8"))
+    # Resolve symlinks so that the file they point to is updated, not the link replaced.
+    target_path = pathlib.Path(file_path).resolve()
+    # A unique name, so nothing else writing alongside the file can clash with it.
+    fd, tmp_name = tempfile.mkstemp(
+        dir=target_path.parent, prefix=f"{target_path.name}.", suffix=".mypy_clean_slate.tmp"
+    )
+    tmp_path = pathlib.Path(tmp_name)
+    try:
+        try:
+            while data:
+                data = data[os.write(fd, data) :]
+        finally:
+            os.close(fd)
+        # Keep the permissions of the original file, eg: if it's executable.
+        tmp_path.chmod(target_path.stat().st_mode)
+        tmp_path.replace(target_path)
+    except BaseException:
+        tmp_path.unlink()
+        raise
+
+
+def _split_line_ending(line: str) -> tuple[str, str]:
+    """Split line into its content and line ending (which may be empty for the last line)."""
+    content = line.rstrip("\r\n")
+    return content, line[len(content) :]
+
+
+def _max_workers(n_files: int) -> int:
+    return max(1, min(32, (os.cpu_count() or 1) * 4, n_files))
+
+
+def write_file_cache(*, file_cache: FileCache) -> None:
+    """Write out all files held in file_cache."""
+    max_workers = _max_workers(len(file_cache))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(lambda x: _write_file_lines(*x), file_cache.items()))
+
+
+def _apply_per_file(
+    *,
+    func: Callable[[str, list[UpdateT]], None],
+    file_updates: list[UpdateT],
+) -> None:
+    """
+    Call func with the updates for each file, with files handled concurrently.
 
+    Updating a file is dominated by reading and writing it, and files are independent of each
+    other, so a thread pool lets the I/O for different files overlap.
+    """
+    # file_updates are sorted by file path, groups need materialising before being handed off.
+    # Different paths can refer to the same file (eg: './a.py' and 'a.py', or a symlink and its
+    # target), so groups are merged by resolved path - otherwise threads would update the same file
+    # at once and one set of updates would be lost. The resolved path is passed on so that it's
+    # also used as the key in any file_cache, whichever path a report used.
+    per_file: dict[str, list[UpdateT]] = {}
+    for file_path, grp in itertools.groupby(file_updates, lambda x: x[0]):
+        per_file.setdefault(str(pathlib.Path(file_path).resolve()), []).extend(grp)
+    grouped = list(per_file.items())
+    with concurrent.futures.ThreadPoolExecutor(max_workers=_max_workers(len(grouped))) as executor:
+        # Consume the results so any exception raised while updating a file is propagated.
+        list(executor.map(lambda x: func(*x), grouped))
+
+
+def _add_ignores_to_file(
+    file_path: str,
+    line_updates: list[LineUpdate],
+    *,
+    file_cache: FileCache | None,
+) -> None:
+    """
+    Add ignores to all lines in file_path which need them, reading and writing it once.
 
-def update_files(*, file_updates: list[FileUpdate]) -> None:
-    # update each line with `# type: ignore[<error-code[s]>]`
-    for pth_and_line_num, grp in itertools.groupby(
-        file_updates,
-        key=lambda x: (x[0], x[1]),
-    ):
-        file_path, line_number = pth_and_line_num
-        error_codes = ", ".join(x[2] for x in grp)
-        file_lines = pathlib.Path(file_path).read_text(encoding="utf8").split("\n")
+    If file_cache is given the file is left in there to be written out later.
+    """
+    file_lines = _read_file_lines(file_path=file_path, file_cache=file_cache)
 
-        python_code, python_comment = extract_code_comment(line=file_lines[line_number])
+    for _, line_number, codes in line_updates:
+        error_codes = ", ".join(codes)
+
+        line, line_ending = _split_line_ending(file_lines[line_number])
+        # Most lines with errors don't have a trailing comment, so skip the call when possible.
+        if "#" in line:
+            python_code, python_comment = extract_code_comment(line=line)
+        else:
+            python_code, python_comment = line, ""
         # In some cases it's possible for there to be multiple spaces added
         # before '# type: ...' whereas we'd like to ensure only two spaces are
         # added.
@@ -169,19 +353,31 @@ def update_files(*, file_updates: list[FileUpdate]) -> None:
         else:
             line_update = f"{python_code}  {mypy_ignore}"
 
-        # check to see if the line contains a trailing comment already - it it does then this line
-        # needs to be handled separately.
-        file_lines[line_number] = line_update.rstrip(" ")
-        new_text = "\n".join(file_lines)
-        with open(file_path, "w", encoding="utf8") as file:
-            file.write(new_text)
+        # check to see if the line contains a trailing comment already - it it does then this
+        # line needs to be handled separately.
+        file_lines[line_number] = line_update.rstrip(" ") + line_ending
+
+    if file_cache is None:
+        _write_file_lines(file_path, file_lines)
+
+
+def update_files(*, file_updates: list[LineUpdate], file_cache: FileCache | None = None) -> None:
+    # update each line with `# type: ignore[<error-code[s]>]`. Updates are sorted by file path so
+    # each file is only read and written once, regardless of how many errors it has.
+    _apply_per_file(
+        func=functools.partial(_add_ignores_to_file, file_cache=file_cache),
+        file_updates=file_updates,
+    )
 
 
 def line_contains_error(*, error_message: str) -> bool:
     """Ensure that the line contains an error message to extract."""
-    if re.match(r".*error.*\[.*\]$", error_message):
-        return True
-    return False
+    # Error lines look like '<path>:<line>: error: <message>  [<error-code>]', so need 'error'
+    # followed by a '[' before the closing ']' which ends the line.
+    error_idx = error_message.find("error")
+    if error_idx == -1 or not error_message.endswith("]"):
+        return False
+    return error_message.find("[", error_idx + len("error"), -1) != -1
 
 
 def line_is_unused_ignore(*, error_message: str) -> bool:
@@ -191,17 +387,32 @@ def line_is_unused_ignore(*, error_message: str) -> bool:
     These are treated differently to other messages, in this case the current
     type: ignore needs to be removed rather than adding one.
     """
-    if re.match('.*unused.ignore.*|Unused "type: ignore" comment', error_message):
-        return True
-    return False
+    return "unused-ignore" in error_message or 'Unused "type: ignore" comment' in error_message
 
 
-def extract_file_line_number_and_error_code(
+def classify_report_lines(
     *,
     error_report_lines: list[str],
-) -> list[FileUpdate]:
-    file_updates: list[FileUpdate] = []
+) -> tuple[list[FileUpdate], list[LineUpdate]]:
+    """
+    Split report lines into unused ignores and errors which need ignoring, in a single pass.
+
+    Returns (unused_ignores, line_updates): unused ignores to be removed, one per reported line,
+    and the error codes to be ignored on each line with errors.
+    """
+    unused_ignores: list[FileUpdate] = []
+    # Collect codes per line as they're parsed. Using a set ensures the codes are unique, for
+    # example given code such as object().foo, object().bar there would be two 'attr-defined'
+    # errors on the same line - leading to ignore[attr-defined, attr-defined] instead of
+    # ignore[attr-defined].
+    line_codes: defaultdict[tuple[str, int], set[str]] = defaultdict(set)
     for error_line in error_report_lines:
+        if 'error: Unused "type: ignore" comment' in error_line:
+            file_path, line_number, message = error_line.split(":", 2)
+            # Decrease by 1 as mypy indexes from 1 not zero
+            unused_ignores.append((sys.intern(file_path), int(line_number) - 1, message))
+            continue
+
         if (not line_contains_error(error_message=error_line)) or line_is_unused_ignore(
             error_message=error_line
         ):
@@ -211,62 +422,119 @@ def extract_file_line_number_and_error_code(
         file_path, line_number, *_ = error_line.split(":")
         # mypy will report the first line as '1' rather than '0'.
         line_num = int(line_number) - 1
-        if error_message := re.match(r"^.*\[(.*)\]$", error_line):
-            file_updates.append((file_path, line_num, error_message.group(1)))
+        code_start = error_line.rfind("[")
+        if code_start != -1 and error_line.endswith("]"):
+            # The same few paths and error codes repeat across many lines, interning them means
+            # the hashing and comparisons done when grouping are mostly identity checks.
+            error_code = sys.intern(error_line[code_start + 1 : -1])
+            line_codes[(sys.intern(file_path), line_num)].add(error_code)
         else:
             # haven't seen anything else yet, though there might be other error types which need to
             # be handled.
             msg = f"Unexpected line format: {error_line}"
             raise RuntimeError(msg)
 
-    # Ensure that the returned updates are unique. For example we might have
-    # file_updates as something like  [('f.py', 0, 'attr-defined'), ('f.py', 0,
-    # 'attr-defined')] given code such as object().foo, object().bar - leading
-    # to igore[attr-defined, attr-defined] instead of ignore[attr-defined]
-    return sorted(set(file_updates), key=lambda x: (x[0], x[1], x[2]))
+    unused_ignores.sort()
+    # Sorted by (file_path, line_number) so updates can be grouped per file, codes are sorted here
+    # so it doesn't need doing when each line is updated.
+    line_updates = [
+        (file_path, line_num, sorted(codes))
+        for (file_path, line_num), codes in sorted(line_codes.items())
+    ]
+    return unused_ignores, line_updates
+
+
+def extract_file_line_number_and_error_code(
+    *,
+    error_report_lines: list[str],
+) -> list[LineUpdate]:
+    _, line_updates = classify_report_lines(error_report_lines=error_report_lines)
+    return line_updates
 
 
 def add_type_ignores(
     *,
-    report_output: pathlib.Path,
+    report_output: pathlib.Path | None = None,
+    report_text: str | None = None,
+    file_cache: FileCache | None = None,
 ) -> None:
-    """Add `# type: ignore` to all lines which fail on given mypy command."""
-    error_report_lines = read_mypy_error_report(path_to_error_report=report_output)
+    """
+    Add `# type: ignore` to all lines which fail on given mypy command.
+
+    The report is read from report_output, or report_text can be given instead when mypy's
+    output is already in memory. Files are written immediately unless file_cache is given, see
+    write_file_cache.
+    """
+    error_report_lines = _get_error_report_lines(
+        report_output=report_output, report_text=report_text
+    )
     exit_if_no_errors(report=error_report_lines)
     # process all lines in report.
     file_updates = extract_file_line_number_and_error_code(
         error_report_lines=error_report_lines,
     )
-    update_files(file_updates=file_updates)
-
-
-def remove_unused_ignores(*, report_output: str) -> str:
-    """Remove ignores which are no longer needed, based on report output."""
-    report_lines = report_output.read_text().split("\n")
-    ignores_lines: list[FileUpdate] = sorted(
-        [
-            tuple(line.split(":", 2))
-            for line in report_lines
-            if 'error: Unused "type: ignore" comment' in line
-        ],
-        key=lambda x: (x[0], x[1]),
+    update_files(file_updates=file_updates, file_cache=file_cache)
+
+
+def _remove_ignores_from_file(
+    file_path: str,
+    file_updates: list[FileUpdate],
+    *,
+    file_cache: FileCache | None,
+) -> None:
+    """
+    Remove unused ignores from lines in file_path, reading and writing it once.
+
+    If file_cache is given the file is left in there to be written out later.
+    """
+    file_lines = _read_file_lines(file_path=file_path, file_cache=file_cache)
+    for _, line_n, _ in file_updates:
+        line, line_ending = _split_line_ending(file_lines[line_n])
+        if "type:" in line:
+            line = _TYPE_IGNORE_RE.sub("", line)
+        file_lines[line_n] = line.rstrip() + line_ending
+
+    if file_cache is None:
+        _write_file_lines(file_path, file_lines)
+
+
+def remove_ignores_from_files(
+    *,
+    unused_ignores: list[FileUpdate],
+    file_cache: FileCache | None = None,
+) -> None:
+    _apply_per_file(
+        func=functools.partial(_remove_ignores_from_file, file_cache=file_cache),
+        file_updates=unused_ignores,
     )
 
-    for file_path, grp in itertools.groupby(ignores_lines, key=lambda x: x[0]):
-        _grp = sorted(grp)
-        file_lines = pathlib.Path(file_path).read_text().split("\n")
-        for _, line_n, _ in _grp:
-            _line_n = int(line_n) - 1  # Decrease by 1 as mypy indexes from 1 not zero
-            regexp = r"#\s*type:\s*ignore(?:\[[^\]]*\])?"
-            file_lines[_line_n] = re.sub(regexp, "", file_lines[_line_n]).rstrip()
 
-        # Write updated file out.
-        with open(file_path, "w", encoding="utf8") as file:
-            file.write("\n".join(file_lines))
+def remove_unused_ignores(
+    *,
+    report_output: pathlib.Path | None = None,
+    report_text: str | None = None,
+    file_cache: FileCache | None = None,
+) -> None:
+    """
+    Remove ignores which are no longer needed, based on report output.
+
+    The report is read from report_output, or report_text can be given instead when mypy's
+    output is already in memory. Files are written immediately unless file_cache is given, see
+    write_file_cache.
+    """
+    error_report_lines = _get_error_report_lines(
+        report_output=report_output, report_text=report_text
+    )
+    unused_ignores, _ = classify_report_lines(error_report_lines=error_report_lines)
+    remove_ignores_from_files(unused_ignores=unused_ignores, file_cache=file_cache)
 
 
 # --- Call functions above.
 def create_parser() -> argparse.ArgumentParser:
+    # Imported here as they're only needed for the CLI, not when using the functions above.
+    import argparse  # noqa: PLC0415
+    import textwrap  # noqa: PLC0415
+
     parser = argparse.ArgumentParser(
         description=textwrap.dedent(
             """
@@ -345,17 +613,29 @@ def main() -> int:
         report_output = pathlib.Path(args.mypy_report_output)
 
     if args.generate_mypy_error_report:
-        report = generate_mypy_error_report(
+        generate_mypy_error_report(
             path_to_code=args.path_to_code,
             mypy_flags=shlex.split(args.mypy_flags),
+            report_output=report_output,
         )
-        report_output.write_text(report, encoding="utf8")
 
-    if args.remove_unused:
-        remove_unused_ignores(report_output=report_output)
+    if args.remove_unused or args.add_type_ignore:
+        # The report is read and parsed once for both passes, and files are shared between them so
+        # each is only read and written once.
+        error_report_lines = read_mypy_error_report(path_to_error_report=report_output)
+        unused_ignores, line_updates = classify_report_lines(
+            error_report_lines=error_report_lines,
+        )
+        file_cache: FileCache = {}
+
+        if args.remove_unused:
+            remove_ignores_from_files(unused_ignores=unused_ignores, file_cache=file_cache)
+
+        if args.add_type_ignore:
+            exit_if_no_errors(report=error_report_lines)
+            update_files(file_updates=line_updates, file_cache=file_cache)
 
-    if args.add_type_ignore:
-        add_type_ignores(report_output=report_output)
+        write_file_cache(file_cache=file_cache)
 
     return 0
 
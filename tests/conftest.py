@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import subprocess
+from typing import TYPE_CHECKING
+
+import pytest
+
+from mypy_clean_slate import main
+
+if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import Callable, Iterator
+    from typing import Protocol
+
+    class GenerateReport(Protocol):
+        def __call__(
+            self,
+            *,
+            path_to_code: pathlib.Path,
+            mypy_flags: list[str],
+            report_output: pathlib.Path,
+            daemon: bool = True,
+        ) -> str: ...
+
+
+@pytest.fixture(scope="session")
+def mypy_executable(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Iterator[Callable[[list[str]], list[str]]]:
+    """
+    Get the command for running mypy with some flags via a daemon shared by the whole session.
+
+    Starting mypy (and loading typeshed etc) is most of the time taken to generate a report for
+    the small files used in tests, the daemon means that's only paid once rather than per test.
+    A daemon restarts if it's run with different flags, so there's one per set of flags. Each is
+    started by its first `dmypy run`, with exactly the options generate_mypy_error_report uses.
+
+    The daemon doesn't reliably report unused ignores for files it hasn't seen before, so tests
+    relying on those being reported run mypy itself.
+    """
+    status_dir = tmp_path_factory.mktemp("dmypy")
+    status_files: dict[tuple[str, ...], pathlib.Path] = {}
+
+    def executable(mypy_flags: list[str]) -> list[str]:
+        status_file = status_files.setdefault(
+            tuple(mypy_flags), status_dir / f"dmypy_{len(status_files)}.json"
+        )
+        return ["dmypy", "--status-file", str(status_file), "run", "--"]
+
+    yield executable
+    for status_file in status_files.values():
+        dmypy = ["dmypy", "--status-file", str(status_file)]
+        subprocess.run([*dmypy, "stop"], check=False, capture_output=True)
+
+
+@pytest.fixture
+def mypy_error_report(
+    mypy_executable: Callable[[list[str]], list[str]],
+) -> GenerateReport:
+    """
+    Run main.generate_mypy_error_report for a test, returning the report written to report_output.
+
+    The mypy daemon for the flags is used unless daemon=False.
+
+    Otherwise mypy is given a cache directory for the test. With a shared cache mypy can report
+    errors against the path of another test's file if it has the same module name and content.
+    """
+
+    def generate(
+        *,
+        path_to_code: pathlib.Path,
+        mypy_flags: list[str],
+        report_output: pathlib.Path,
+        daemon: bool = True,
+    ) -> str:
+        main.generate_mypy_error_report(
+            path_to_code=path_to_code,
+            mypy_flags=mypy_flags,
+            report_output=report_output,
+            mypy_executable=(
+                mypy_executable(mypy_flags)
+                if daemon
+                else ("mypy", "--cache-dir", str(report_output.parent / ".mypy_cache"))
+            ),
+        )
+        return report_output.read_text(encoding="utf8")
+
+    return generate
@@ -1,197 +1,263 @@
 from __future__ import annotations
 
+import json
 import pathlib
-import textwrap
+import re
+import sys
+from typing import TYPE_CHECKING
 
-from mypy_clean_slate import __version__, main
-
-
-def test_version() -> None:
-    # Ensure toml version is in sync with package version.
-    with open("pyproject.toml") as f:
-        pyproject_version = [line for line in f.readlines() if line.startswith("version = ")]
-    assert len(pyproject_version) == 1
-    assert pyproject_version[0].strip().split(" = ")[-1].replace('"', "") == __version__
-
-
-def test_mypy_clean_slate_usage(tmp_path: pathlib.Path) -> None:
-    # atm this is a pretty broad usage test - just checks that things are, pretty much,
-    # working as expected.
-    py_file_before_fix = textwrap.dedent(
-        """
-    from __future__ import annotations
-
-
-    def add(*, arg_1, arg_2):
-        return arg_1 + arg_2
-
-
-    add(arg_1=1, arg_2="s") # inline comment.
-
-
-    def useless_sub(*, arg_1: float, arg_2: Sequence):
-        return add(arg_1=arg_1, arg_2="what") - arg_2
+import pytest
 
+from mypy_clean_slate import __version__, main
 
-    useless_sub(arg_1=3, arg_2=4)
-    useless_sub(arg_1=3, arg_2="4")
-    """,
-    ).strip()
-
-    py_file_after_fix = textwrap.dedent(
-        """
-from __future__ import annotations
-
+if TYPE_CHECKING:
+    from .conftest import GenerateReport
 
-def add(*, arg_1, arg_2):  # type: ignore[no-untyped-def]
-    return arg_1 + arg_2
 
+def _source(lines: list[str]) -> bytes:
+    """Join and encode lines of source code for writing to test files."""
+    return "\n".join(lines).encode()
 
-add(arg_1=1, arg_2="s")  # type: ignore[no-untyped-call] # inline comment.
 
+# Code before and after running mypy_clean_slate for each case.
+_CASES = json.loads(
+    pathlib.Path(__file__).with_name("fixtures").joinpath("mypy_cases.json").read_bytes()
+)
+_BEFORE_REMOVE_UNUSED = _source(_CASES["remove_unused"]["before"])
+_AFTER_REMOVE_UNUSED = _source(_CASES["remove_unused"]["after"])
+_BEFORE_MULTIPLE_FILES = _source(_CASES["multiple_files"]["before"])
+_AFTER_MULTIPLE_FILES = _source(_CASES["multiple_files"]["after"])
+_BEFORE_FILE_CACHE = _source(_CASES["file_cache"]["before"])
+_AFTER_FILE_CACHE = _source(_CASES["file_cache"]["after"])
 
-def useless_sub(*, arg_1: float, arg_2: Sequence):  # type: ignore[name-defined, no-untyped-def]
-    return add(arg_1=arg_1, arg_2="what") - arg_2  # type: ignore[no-untyped-call]
 
+def test_version() -> None:
+    # Ensure toml version is in sync with package version.
+    match = re.search(rb'(?m)^version = "([^"]+)"', pathlib.Path("pyproject.toml").read_bytes())
+    assert match is not None
+    assert match.group(1).decode() == __version__
+
+
+@pytest.mark.parametrize(
+    ("before", "after", "mypy_flags"),
+    [
+        pytest.param(
+            _source(case["before"]), _source(case["after"]), case["mypy_flags"], id=case_id
+        )
+        for case_id, case in _CASES["single_file"].items()
+    ],
+)
+def test_mypy_clean_slate(
+    tmp_path: pathlib.Path,
+    mypy_error_report: GenerateReport,
+    before: bytes,
+    after: bytes,
+    mypy_flags: list[str],
+) -> None:
+    """Ensure ignores are added for errors in a single file."""
+    python_file = pathlib.Path(tmp_path, "file_to_check.py")
+    python_file.write_bytes(before)
 
-useless_sub(arg_1=3, arg_2=4)
-useless_sub(arg_1=3, arg_2="4")
-    """.strip(),
+    # there's probably a much nicer way to write these tests.
+    report_output = pathlib.Path(tmp_path, "testing_report_output.txt")
+    report_text = mypy_error_report(
+        path_to_code=python_file,
+        mypy_flags=mypy_flags,
+        report_output=report_output,
     )
+    main.add_type_ignores(report_text=report_text)
+    assert python_file.read_bytes().strip() == after
 
+
+def test_remove_used_ignores(tmp_path: pathlib.Path, mypy_error_report: GenerateReport) -> None:
+    """Ensure unused ignores raised as errors are removed."""
     python_file = pathlib.Path(tmp_path, "file_to_check.py")
-    python_file.write_text(py_file_before_fix, encoding="utf8")
+    python_file.write_bytes(_BEFORE_REMOVE_UNUSED)
 
-    # there's probably a much nicer way to write these tests.
     report_output = pathlib.Path(tmp_path, "testing_report_output.txt")
-    report_output.write_text(
-        main.generate_mypy_error_report(path_to_code=python_file, mypy_flags=[""]),
-        encoding="utf8",
+    mypy_error_report(
+        path_to_code=python_file,
+        mypy_flags=[""],
+        report_output=report_output,
+        # The daemon doesn't reliably report unused ignores.
+        daemon=False,
     )
-
+    # Read the report from report_output here, as the CLI does.
+    main.remove_unused_ignores(report_output=report_output)
     main.add_type_ignores(report_output=report_output)
-    assert python_file.read_text(encoding="utf8").strip() == py_file_after_fix
+    assert python_file.read_bytes().strip() == _AFTER_REMOVE_UNUSED
+
+
+@pytest.mark.parametrize(
+    ("line", "expected"),
+    [
+        ("x = 1", ("x = 1", "")),
+        ("x = 1  # comment", ("x = 1  ", "# comment")),
+        ('x = "#"', ('x = "#"', "")),
+        ('x = "#"  # comment', ('x = "#"  ', "# comment")),
+        ("x = '\\'#'  # comment", ("x = '\\'#'  ", "# comment")),
+        ('x = """#"""  # comment', ('x = """#"""  ', "# comment")),
+        ('x = f"{y}#"  # comment', ('x = f"{y}#"  ', "# comment")),
+        ('my_string = "hello #world"', ('my_string = "hello #world"', "")),
+        ("my_string = 'hello #world'", ("my_string = 'hello #world'", "")),
+        ("# comment", ("", "# comment")),
+        ("    # indented comment", ("    ", "# indented comment")),
+        ("x = 1  #", ("x = 1  ", "#")),
+        ("x = 1  # comment # more", ("x = 1  ", "# comment # more")),
+        ("x = 1  # type: ignore[misc]", ("x = 1  ", "# type: ignore[misc]")),
+        ('x = "a" + "#" + "b"  # comment', ('x = "a" + "#" + "b"  ', "# comment")),
+        ('x = "\\\\"  # comment', ('x = "\\\\"  ', "# comment")),
+        ('x = "\\\\" + "#"', ('x = "\\\\" + "#"', "")),
+        ('x = "\'#"  # comment', ('x = "\'#"  ', "# comment")),
+        ("x = '\"#'  # comment", ("x = '\"#'  ", "# comment")),
+        ("x = '''#'''  # comment", ("x = '''#'''  ", "# comment")),
+        ('x = """a"b#"""  # comment', ('x = """a"b#"""  ', "# comment")),
+        ('x = b"#"  # comment', ('x = b"#"  ', "# comment")),
+        ('x = r"#"  # comment', ('x = r"#"  ', "# comment")),
+        ('x = {"#": 1}["#"]  # comment', ('x = {"#": 1}["#"]  ', "# comment")),
+        ('f("#", y="#")  # comment "#"', ('f("#", y="#")  ', '# comment "#"')),
+        ("x = f\"{d['#']}\"  # comment", ("x = f\"{d['#']}\"  ", "# comment")),
+        pytest.param(
+            'x = f"{d["#"]}"  # comment',
+            ('x = f"{d["#"]}"  ', "# comment"),
+            marks=pytest.mark.skipif(
+                sys.version_info < (3, 12),
+                reason="f-strings can only reuse their own quotes from 3.12 onwards.",
+            ),
+        ),
+    ],
+)
+def test_extract_code_comment(line: str, expected: tuple[str, str]) -> None:
+    assert main.extract_code_comment(line=line) == expected
 
 
-def test_no_duplicate_codes_added(tmp_path: pathlib.Path) -> None:
-    """Ensure duplicate ignore messages aren't applied."""
-    py_file_before_fix = textwrap.dedent(
-        """
-    from __future__ import annotations
+def test_multiple_files_updated(tmp_path: pathlib.Path, mypy_error_report: GenerateReport) -> None:
+    """Ensure each file is updated when errors are reported across several files."""
+    python_files = [pathlib.Path(tmp_path, f"file_to_check_{i}.py") for i in range(4)]
+    for python_file in python_files:
+        python_file.write_bytes(_BEFORE_MULTIPLE_FILES)
 
-    object().foo, object().bar
-    """,
-    ).strip()
+    report_output = pathlib.Path(tmp_path, "testing_report_output.txt")
+    report_text = mypy_error_report(
+        path_to_code=tmp_path,
+        mypy_flags=[""],
+        report_output=report_output,
+    )
 
-    py_file_after_fix = textwrap.dedent(
-        """
-    from __future__ import annotations
+    main.add_type_ignores(report_text=report_text)
+    for python_file in python_files:
+        assert python_file.read_bytes().strip() == _AFTER_MULTIPLE_FILES
 
-    object().foo, object().bar  # type: ignore[attr-defined]
-    """
-    ).strip()
 
+def test_remove_and_add_with_file_cache(
+    tmp_path: pathlib.Path, mypy_error_report: GenerateReport
+) -> None:
+    """Ensure both passes can share files, which are only written out at the end."""
     python_file = pathlib.Path(tmp_path, "file_to_check.py")
-    python_file.write_text(py_file_before_fix, encoding="utf8")
+    python_file.write_bytes(_BEFORE_FILE_CACHE)
 
     report_output = pathlib.Path(tmp_path, "testing_report_output.txt")
-    report_output.write_text(
-        main.generate_mypy_error_report(path_to_code=python_file, mypy_flags=[""]),
-        encoding="utf8",
+    report_text = mypy_error_report(
+        path_to_code=python_file,
+        mypy_flags=[""],
+        report_output=report_output,
+        daemon=False,
     )
+    file_cache: main.FileCache = {}
+    main.remove_unused_ignores(report_text=report_text, file_cache=file_cache)
+    main.add_type_ignores(report_text=report_text, file_cache=file_cache)
+    assert python_file.read_bytes() == _BEFORE_FILE_CACHE
 
-    main.add_type_ignores(report_output=report_output)
-    assert python_file.read_text(encoding="utf8").strip() == py_file_after_fix
-
+    main.write_file_cache(file_cache=file_cache)
+    assert python_file.read_bytes().strip() == _AFTER_FILE_CACHE
 
-def test_custom_mypy_flags(tmp_path: pathlib.Path) -> None:
-    """Ensure custom mypy flags are respected."""
-    py_file_before_fix = textwrap.dedent(
-        """
-    def f(x):
-        return x ** 2
 
-    def main() -> int:
-        y = f(12)
-        return 0
+def test_extract_code_comment_unterminated_string() -> None:
+    """Lines which start a multi-line string can't be split, so are left as code."""
+    line = 'x = """start of string # not a comment'
+    with pytest.warns(UserWarning, match="Unterminated string literal"):
+        assert main.extract_code_comment(line=line) == (line, "")
 
-    if __name__ == '__main__':
-        raise SystemExit(main())
-    """,
-    ).strip()
 
-    py_file_after_fix = textwrap.dedent(
-        """
-    def f(x):
-        return x ** 2
+def test_update_files_keeps_line_endings(tmp_path: pathlib.Path) -> None:
+    """Ensure line endings are preserved, including a missing one on the last line."""
+    python_file = pathlib.Path(tmp_path, "file_to_check.py")
+    python_file.write_bytes(b"def f(x):\r\n    return x\r\n\r\nf(1)")
 
-    def main() -> int:
-        y = f(12)  # type: ignore[no-untyped-call]
-        return 0
+    main.update_files(
+        file_updates=[
+            (str(python_file), 0, ["no-untyped-def"]),
+            (str(python_file), 3, ["no-untyped-call"]),
+        ]
+    )
+    assert python_file.read_bytes() == (
+        b"def f(x):  # type: ignore[no-untyped-def]\r\n"
+        b"    return x\r\n"
+        b"\r\n"
+        b"f(1)  # type: ignore[no-untyped-call]"
+    )
 
-    if __name__ == '__main__':
-        raise SystemExit(main())
-    """
-    ).strip()
 
+def test_update_files_keeps_permissions(tmp_path: pathlib.Path) -> None:
+    """Files are replaced when written, ensure that doesn't change their mode."""
     python_file = pathlib.Path(tmp_path, "file_to_check.py")
-    python_file.write_text(py_file_before_fix, encoding="utf8")
+    python_file.write_bytes(b"def f(x):\n    return x\n")
+    mode = 0o755
+    python_file.chmod(mode)
 
-    # there's probably a much nicer way to write these tests.
-    report_output = pathlib.Path(tmp_path, "testing_report_output.txt")
-    report_output.write_text(
-        main.generate_mypy_error_report(
-            path_to_code=python_file, mypy_flags=["--disallow-untyped-calls"]
-        ),
-        encoding="utf8",
-    )
+    main.update_files(file_updates=[(str(python_file), 0, ["no-untyped-def"])])
+    assert python_file.stat().st_mode & 0o777 == mode
+    assert list(tmp_path.iterdir()) == [python_file]
 
-    main.add_type_ignores(report_output=report_output)
-    assert python_file.read_text(encoding="utf8").strip() == py_file_after_fix
 
+def test_update_files_same_file_different_paths(tmp_path: pathlib.Path) -> None:
+    """Ensure updates are all applied when a file is reported under more than one path."""
+    python_file = pathlib.Path(tmp_path, "file_to_check.py")
+    python_file.write_bytes(b"def f(x):\n    return x\n\nf(1)\n")
+    symlink = pathlib.Path(tmp_path, "link_to_file.py")
+    symlink.symlink_to(python_file)
+
+    file_cache: main.FileCache = {}
+    main.update_files(
+        file_updates=[
+            (str(symlink), 3, ["no-untyped-call"]),
+            (str(python_file), 0, ["no-untyped-def"]),
+        ],
+        file_cache=file_cache,
+    )
+    assert list(file_cache) == [str(python_file.resolve())]
+
+    main.write_file_cache(file_cache=file_cache)
+    assert python_file.read_bytes() == (
+        b"def f(x):  # type: ignore[no-untyped-def]\n"
+        b"    return x\n"
+        b"\n"
+        b"f(1)  # type: ignore[no-untyped-call]\n"
+    )
+    assert symlink.is_symlink()
+    assert sorted(tmp_path.iterdir()) == [python_file, symlink]
 
-def test_remove_used_ignores(tmp_path: pathlib.Path) -> None:
-    """Ensure unused ignores raised as errors are removed."""
-    py_file_before_fix = textwrap.dedent(
-        """
-    def f(x : float) -> float:
-        return x ** 2
-
-    def main() -> int:
-        y = f(12)  # type: ignore[no-untyped-call]
-        return 0
-
-    if __name__ == '__main__':
-        raise SystemExit(main())
-    """,
-    ).strip()
-
-    py_file_after_fix = textwrap.dedent(
-        """
-    def f(x : float) -> float:
-        return x ** 2
-
-    def main() -> int:
-        y = f(12)
-        return 0
-
-    if __name__ == '__main__':
-        raise SystemExit(main())
-    """
-    ).strip()
 
+def test_main_remove_and_add(
+    tmp_path: pathlib.Path,
+    mypy_error_report: GenerateReport,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ensure the CLI removes unused ignores and adds missing ones from a single report."""
     python_file = pathlib.Path(tmp_path, "file_to_check.py")
-    python_file.write_text(py_file_before_fix, encoding="utf8")
+    python_file.write_bytes(_BEFORE_FILE_CACHE)
 
-    # there's probably a much nicer way to write these tests.
     report_output = pathlib.Path(tmp_path, "testing_report_output.txt")
-    report_output.write_text(
-        main.generate_mypy_error_report(
-            path_to_code=python_file,
-            mypy_flags=[""],
-        ),
-        encoding="utf8",
+    mypy_error_report(
+        path_to_code=python_file,
+        mypy_flags=[""],
+        report_output=report_output,
+        daemon=False,
     )
-    main.remove_unused_ignores(report_output=report_output)
-    main.add_type_ignores(report_output=report_output)
-    assert python_file.read_text(encoding="utf8").strip() == py_file_after_fix
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["mypy_clean_slate", "--remove_unused", "--add_type_ignore", "-o", str(report_output)],
+    )
+    assert main.main() == 0
+    assert python_file.read_bytes().strip() == _AFTER_FILE_CACHE